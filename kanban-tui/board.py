@@ -1,23 +1,42 @@
+import asyncio
+import os
+from typing import Optional
+from http.client import HTTPException
+
 from textual.app import App, ComposeResult
 from textual.binding import Binding
-from textual.widgets import Header, Footer, Button, Input, Static, TextArea
+from textual.widgets import Header, Footer, Button, Input, OptionList, Static, TextArea
+from textual.widgets.option_list import Option
 from textual.containers import Horizontal, Vertical, VerticalScroll
 from textual.screen import Screen, ModalScreen
 from textual.events import MouseDown, MouseMove, MouseUp
 
+from model import BoardModel, CardModel, ColumnModel
 from storage import load_board, save_board, DATA_FILE, get_default_data
+from snapshots import FrozenBoard, SnapshotInfo, SnapshotStore, SNAPSHOT_INTERVAL, freeze_board, replace_column
+from sync import SyncEngine, SYNC_INTERVAL
 
 
 class Card(Static):
-    """A draggable card widget."""
+    """A draggable card widget, bound by reference to a CardModel."""
     can_focus = True
     can_drag = True
 
-    def __init__(self, label: str, description: str, details: str = "") -> None:
-        self.label = label
-        self.description = description
-        self.details = details
-        super().__init__(label)
+    def __init__(self, model: CardModel) -> None:
+        self.model = model
+        super().__init__(model.label)
+
+    @property
+    def label(self) -> str:
+        return self.model.label
+
+    @property
+    def description(self) -> str:
+        return self.model.description
+
+    @property
+    def details(self) -> str:
+        return self.model.details
 
     def render(self) -> str:
         """Render the card with label and description."""
@@ -36,23 +55,26 @@ class Card(Static):
     
 
 class Column(Vertical):
-    """A column in the Kanban board."""
+    """A column in the Kanban board, bound by reference to a ColumnModel."""
     can_focus = True
-    def __init__(self, title: str, cards_data: list) -> None:
+    def __init__(self, model: ColumnModel, cards_data: list) -> None:
         super().__init__()
-        self.title = title
+        self.model = model
         self.cards_data = cards_data
         self.card_list_widget = VerticalScroll(classes="card-list")
 
+    @property
+    def title(self) -> str:
+        return self.model.title
+
     def compose(self) -> ComposeResult:
         yield Static(self.title, classes="column-title")
         yield self.card_list_widget
 
     def on_mount(self) -> None:
         """Called when the column is mounted, adds cards to the column."""
-        for card_data in self.cards_data:
-            card = Card(label=card_data["label"], description=card_data.get("description", ""), details=card_data.get("details", ""))
-            self.card_list_widget.mount(card)
+        for card_model in self.cards_data:
+            self.card_list_widget.mount(Card(card_model))
 
     def add_card_widget(self, card: Card) -> None:
         """Adds a card widget to this column."""
@@ -166,6 +188,73 @@ class CardDetailScreen(ModalScreen):
         self.dismiss()
 
 
+class SnapshotScreen(ModalScreen):
+    """Screen to browse board snapshots and restore a board or a single column."""
+
+    def __init__(self, store: SnapshotStore, board: BoardModel) -> None:
+        super().__init__()
+        self.store = store
+        self.board = board
+        self.snapshots = store.list_snapshots()
+
+    def compose(self) -> ComposeResult:
+        yield Vertical(
+            Static("Board History", classes="dialog-title"),
+            OptionList(
+                *[Option(f"{info.time}  ({info.columns} columns, {info.cards} cards)", id=str(i))
+                  for i, info in enumerate(self.snapshots)],
+                id="snapshots",
+            ),
+            Static("No snapshots yet." if not self.snapshots else "", id="diff-summary"),
+            OptionList(id="snapshot-columns"),
+            Horizontal(
+                Button("Restore Board", variant="primary", id="restore_board"),
+                Button("Restore Column", id="restore_column"),
+                Button("Close", id="close"),
+                classes="dialog-buttons",
+            ),
+            classes="dialog",
+        )
+
+    def _selected(self):
+        index = self.query_one("#snapshots", OptionList).highlighted
+        return self.snapshots[index] if index is not None else None
+
+    def on_option_list_option_highlighted(self, event: OptionList.OptionHighlighted) -> None:
+        """
+        Shows the diff summary and columns of the highlighted snapshot. The
+        board is captured right away; reading and comparing happen in a thread.
+        """
+        if event.option_list.id != "snapshots":
+            return
+        info = self.snapshots[event.option_index]
+        self.query_one("#diff-summary", Static).update("Comparing with the current board...")
+        self.query_one("#snapshot-columns", OptionList).clear_options()
+        frozen = freeze_board(self.board)
+        self.run_worker(self._show_diff(info, frozen), group="diff", exclusive=True, exit_on_error=False)
+
+    async def _show_diff(self, info: SnapshotInfo, frozen: FrozenBoard) -> None:
+        lines, columns = await asyncio.to_thread(
+            lambda: (self.store.diff_summary(info.digest, frozen), self.store.columns(info.digest))
+        )
+        if self._selected() is not info:
+            # The highlight moved on while this snapshot was being compared.
+            return
+        self.query_one("#diff-summary", Static).update("\n".join(lines) or "Same as the current board.")
+        self.query_one("#snapshot-columns", OptionList).add_options(column["title"] for column in columns)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        info = self._selected()
+        if info is None or event.button.id == "close":
+            self.dismiss(None)
+        elif event.button.id == "restore_board":
+            self.dismiss(("board", info.digest, None))
+        else:
+            column_index = self.query_one("#snapshot-columns", OptionList).highlighted
+            if column_index is not None:
+                self.dismiss(("column", info.digest, column_index))
+
+
 class KanbanApp(App):
     """A simple Kanban board app for the terminal."""
 
@@ -174,6 +263,9 @@ class KanbanApp(App):
     def __init__(self):
         super().__init__()
         self._drag_card = None
+        self.sync = None
+        self._syncing = False
+        self._rebuild_after_drag = False
 
     BINDINGS = [
         Binding(key="a", action="add_card", description="Add Card"),
@@ -186,6 +278,7 @@ class KanbanApp(App):
         Binding(key="x", action="delete_column", description="Delete Column"),
         Binding(key="r", action="rename_column", description="Rename Column"),
         Binding(key="ctrl+x", action="clear_board", description="Clear Board"),
+        Binding(key="h", action="view_history", description="History"),
         Binding(key="up", action="focus_up", description="Focus Up"),
         Binding(key="down", action="focus_down", description="Focus Down"),
         Binding(key="left", action="focus_left", description="Focus Left"),
@@ -195,12 +288,60 @@ class KanbanApp(App):
 
     def on_mount(self) -> None:
         """Called when the app is first mounted."""
-        self.board_data = load_board()
+        self.board = load_board()
+
+        # Take a snapshot at startup and then periodically.
+        self.snapshots = SnapshotStore()
+        self.take_snapshot()
+        self.set_interval(SNAPSHOT_INTERVAL, self.take_snapshot)
+
+        # Sync is optional and only runs when a server URL is configured.
+        sync_url = os.environ.get("ADP_PLANNER_SYNC_URL")
+        if sync_url:
+            self.sync = SyncEngine(sync_url)
+            self.set_interval(SYNC_INTERVAL, self.start_sync)
 
     def on_ready(self) -> None:
         """Called when the DOM is ready."""
         self.rebuild_board()
 
+    def take_snapshot(self) -> None:
+        """
+        Stores a snapshot of the board if it changed since the last one.
+        The board is captured right away; hashing and writing happen in a
+        thread so the UI does not freeze on large boards.
+        """
+        frozen = freeze_board(self.board)
+        self.run_worker(asyncio.to_thread(self.snapshots.take_frozen, frozen), group="snapshot", exit_on_error=False)
+
+    def start_sync(self) -> None:
+        """Starts a background sync round unless one is already running."""
+        if self.sync and not self._syncing:
+            self._syncing = True
+            self.run_worker(self._sync_round(), group="sync", exit_on_error=False)
+
+    async def _sync_round(self) -> None:
+        """Runs one sync round on the event loop; HTTP happens in a thread."""
+        try:
+            # Remote changes go to whichever board is current once the pull
+            # returns, in case it was cleared or restored meanwhile.
+            pushed, applied = await self.sync.sync(lambda: self.board)
+        except (OSError, ValueError, HTTPException) as error:
+            # Offline, server down or a garbled response: unacknowledged
+            # deltas stay queued.
+            self.log.warning(f"Sync failed: {error}")
+            return
+        finally:
+            self._syncing = False
+        if pushed or applied:
+            save_board(self.board)
+        if applied:
+            if self._drag_card is None:
+                self.rebuild_board()
+            else:
+                # Rebuilding now would remove the card being dragged.
+                self._rebuild_after_drag = True
+
     def start_dragging(self, card: Card, event: MouseDown) -> None:
         self._drag_card = card
         self._drag_offset_x = event.x - card.offset.x
@@ -221,66 +362,57 @@ class KanbanApp(App):
                     break
             self._drag_card.display = True
 
-            if target_column and target_column != self._drag_card.parent.parent:
-                old_column_widget = self._drag_card.parent.parent
-                old_column_index = list(self.query(Column)).index(old_column_widget)
-
-                card_data_to_move = {
-                    "label": self._drag_card.label,
-                    "description": self._drag_card.description,
-                    "details": self._drag_card.details
-                }
-
-                self.board_data["columns"][old_column_index]["cards"] = [
-                    card for card in self.board_data["columns"][old_column_index]["cards"]
-                    if not (card["label"] == card_data_to_move["label"] and
-                           card.get("description", "") == card_data_to_move["description"] and
-                           card.get("details", "") == card_data_to_move["details"])
-                ]
+            card_model = self._drag_card.model
+            if (target_column and target_column != self._drag_card.parent.parent
+                    # A sync round may have removed the card or the column
+                    # from the model while the drag was in progress.
+                    and card_model.column is not None
+                    and target_column.model in self.board.columns):
+                self.board.move_card(card_model, target_column.model)
 
-                new_column_index = list(self.query(Column)).index(target_column)
-                self.board_data["columns"][new_column_index]["cards"].append(card_data_to_move)
-
-                save_board(self.board_data)
+                save_board(self.board)
                 self.rebuild_board()
 
             if self._drag_card:
                 self._drag_card.remove_class("dragging")
                 self._drag_card = None
 
+            if self._rebuild_after_drag:
+                self._rebuild_after_drag = False
+                self.rebuild_board()
+
     def rebuild_board(self):
-        """Clears and rebuilds the board from the board_data."""
+        """Clears and rebuilds the board from the board model."""
         board_container = self.query_one("#board-container")
         board_container.remove_children()
 
-        for column_data in self.board_data["columns"]:
-            column = Column(title=column_data["title"], cards_data=column_data["cards"])
+        for column_model in self.board.columns:
+            column = Column(column_model, cards_data=list(self.board.iter_cards(column_model)))
             board_container.mount(column)
 
     def action_add_card(self) -> None:
         """Action to add a new card."""
         # Ensure there's at least one column before pushing the screen
-        if not self.board_data["columns"]:
-            from storage import get_default_data
-            self.board_data = get_default_data()
+        if not self.board.columns:
+            self.board = BoardModel.from_dict(get_default_data())
             self.rebuild_board()
 
         def add_card_callback(data):
             if data:
                 title, description, details = data
-                new_card_data = {"label": title, "description": description, "details": details}
-                
+
                 # Add to data structure
-                self.board_data["columns"][0]["cards"].append(new_card_data)
-                
+                new_card_model = self.board.add_card(
+                    self.board.columns[0], CardModel(label=title, description=description, details=details)
+                )
+
                 # Add to UI
-                new_card = Card(label=title, description=description, details=details)
                 first_column = self.query(Column).first() # Use .first() to get the first column
                 if first_column: # Ensure a column exists before adding the widget
-                    first_column.add_card_widget(new_card)
+                    first_column.add_card_widget(Card(new_card_model))
 
                 # Save the new state
-                save_board(self.board_data)
+                save_board(self.board)
 
         self.push_screen(AddCardScreen(), add_card_callback)
 
@@ -288,15 +420,14 @@ class KanbanApp(App):
         """Action to add a new column."""
         def add_column_callback(column_title):
             if column_title:
-                new_column_data = {"title": column_title, "cards": []}
-                self.board_data["columns"].append(new_column_data)
-                
+                new_column_model = self.board.add_column(column_title)
+
                 # Add to UI
-                new_column = Column(title=column_title, cards_data=[])
+                new_column = Column(new_column_model, cards_data=[])
                 self.query_one("#board-container").mount(new_column)
 
                 # Save the new state
-                save_board(self.board_data)
+                save_board(self.board)
 
         self.push_screen(AddColumnScreen(), add_column_callback)
 
@@ -309,16 +440,10 @@ class KanbanApp(App):
             card_to_delete.remove()
 
             # Remove from data structure
-            for column_data in self.board_data["columns"]:
-                column_data["cards"] = [
-                    card for card in column_data["cards"]
-                    if not (card["label"] == card_to_delete.label and
-                           card.get("description", "") == card_to_delete.description and
-                           card.get("details", "") == card_to_delete.details)
-                ]
-            
+            self.board.remove_card(card_to_delete.model)
+
             # Save the new state
-            save_board(self.board_data)
+            save_board(self.board)
 
     def _move_card(self, direction: int) -> None:
         """Helper method to move the focused card left or right."""
@@ -333,37 +458,20 @@ class KanbanApp(App):
             target_column_index = current_column_index + direction
 
             if 0 <= target_column_index < len(all_columns):
-                # Store data of the card to move
-                card_data_to_move = {
-                    "label": card_to_move.label,
-                    "description": card_to_move.description,
-                    "details": card_to_move.details
-                }
-
-                # Remove from old column data
-                self.board_data["columns"][current_column_index]["cards"] = [
-                    card for card in self.board_data["columns"][current_column_index]["cards"]
-                    if not (card["label"] == card_data_to_move["label"] and
-                           card.get("description", "") == card_data_to_move["description"] and
-                           card.get("details", "") == card_data_to_move["details"])
-                ]
-
-                # Add to new column data
-                self.board_data["columns"][target_column_index]["cards"].append(card_data_to_move)
+                card_model = card_to_move.model
+                self.board.move_card(card_model, all_columns[target_column_index].model)
 
                 # Save the new state and rebuild the board
-                save_board(self.board_data)
+                save_board(self.board)
                 self.rebuild_board()
 
                 # After rebuild, query for the new target column and the new card instance
                 new_all_columns = list(self.query(Column))
                 new_target_column_widget = new_all_columns[target_column_index]
 
-                # Find the newly moved card in the new target column
+                # Find the widget bound to the moved card in the new target column
                 for new_card_widget in new_target_column_widget.card_list_widget.children:
-                    if (new_card_widget.label == card_data_to_move["label"] and
-                        new_card_widget.description == card_data_to_move["description"] and
-                        new_card_widget.details == card_data_to_move["details"]):
+                    if new_card_widget.model is card_model:
                         new_card_widget.focus()
                         break
 
@@ -383,34 +491,13 @@ class KanbanApp(App):
             def edit_card_callback(data):
                 if data:
                     new_title, new_description, new_details = data
-                    
-                    # Store original values for identification
-                    original_label = card_to_edit.label
-                    original_description = card_to_edit.description
-                    original_details = card_to_edit.details
-
-                    # Update data structure first
-                    for column_data in self.board_data["columns"]:
-                        for card in column_data["cards"]:
-                            if (card["label"] == original_label and
-                                card.get("description", "") == original_description and
-                                card.get("details", "") == original_details):
-                                card["label"] = new_title
-                                card["description"] = new_description
-                                card["details"] = new_details
-                                break
-                        else:
-                            continue
-                        break
 
-                    # Update UI
-                    card_to_edit.label = new_title
-                    card_to_edit.description = new_description
-                    card_to_edit.details = new_details
+                    # Update the model; the widget reads from it by reference
+                    self.board.update_card(card_to_edit.model, new_title, new_description, new_details)
                     card_to_edit.refresh()
 
                     # Save the new state
-                    save_board(self.board_data)
+                    save_board(self.board)
 
             self.push_screen(AddCardScreen(initial_title=card_to_edit.label, initial_description=card_to_edit.description, initial_details=card_to_edit.details), edit_card_callback)
 
@@ -418,18 +505,15 @@ class KanbanApp(App):
         """Action to delete the currently focused column."""
         if isinstance(self.focused, Column):
             column_to_delete = self.focused
-            
-            all_columns = list(self.query(Column))
-            current_column_index = all_columns.index(column_to_delete)
 
             # Remove from UI
             column_to_delete.remove()
 
             # Remove from data structure
-            del self.board_data["columns"][current_column_index]
-            
+            self.board.remove_column(column_to_delete.model)
+
             # Save the new state
-            save_board(self.board_data)
+            save_board(self.board)
 
     def action_rename_column(self) -> None:
         """Action to rename the currently focused column."""
@@ -438,18 +522,14 @@ class KanbanApp(App):
 
             def rename_column_callback(new_title):
                 if new_title:
+                    # Update data structure
+                    self.board.rename_column(column_to_rename.model, new_title)
+
                     # Update UI
-                    column_to_rename.title = new_title
                     column_to_rename.query_one(".column-title").update(new_title)
 
-                    # Update data structure
-                    for column_data in self.board_data["columns"]:
-                        if column_data["title"] == column_to_rename.title:
-                            column_data["title"] = new_title
-                            break
-
                     # Save the new state
-                    save_board(self.board_data)
+                    save_board(self.board)
 
             self.push_screen(AddColumnScreen(initial_title=column_to_rename.title), rename_column_callback)
 
@@ -457,12 +537,33 @@ class KanbanApp(App):
         """Action to clear all columns and cards from the board."""
         def clear_board_callback(confirmed: bool):
             if confirmed:
-                self.board_data = get_default_data() # Reset to default empty board
+                self.take_snapshot() # Keep the board being cleared in history
+                self.board = BoardModel.from_dict(get_default_data()) # Reset to default empty board
                 self.rebuild_board() # Clear UI and rebuild
-                save_board(self.board_data) # Persist empty state
+                save_board(self.board) # Persist empty state
 
         self.push_screen(ConfirmScreen("Are you sure you want to clear the entire board?"), clear_board_callback)
 
+    def action_view_history(self) -> None:
+        """Action to browse snapshots and restore the board or one column."""
+        def restore_callback(choice):
+            if choice:
+                kind, digest, column_index = choice
+                self.take_snapshot() # Make the restore itself undoable
+                self.run_worker(self._restore(kind, digest, column_index), group="restore", exit_on_error=False)
+
+        self.push_screen(SnapshotScreen(self.snapshots, self.board), restore_callback)
+
+    async def _restore(self, kind: str, digest: str, column_index: Optional[int]) -> None:
+        """Reads a snapshot in a thread, then applies it to the board."""
+        if kind == "board":
+            self.board = await asyncio.to_thread(self.snapshots.restore, digest)
+        else:
+            title, cards = await asyncio.to_thread(self.snapshots.load_column, digest, column_index)
+            replace_column(self.board, title, cards)
+        self.rebuild_board()
+        save_board(self.board)
+
     def action_focus_up(self) -> None:
         """Action to move focus to the card above."""
         if isinstance(self.focused, Card):
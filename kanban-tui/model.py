@@ -0,0 +1,188 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# Upper bound on the structural memory cost of a single card, in bytes, at
+# 100k cards. This covers the slotted card object, its slot in the board's
+# card table and its entry in a column's order array. The card's own text
+# (label, description, details) is not counted, since that is user content.
+CARD_MEMORY_BUDGET = 160
+
+# Typecode for the compact per-column card order arrays. Entries are indexes
+# into BoardModel.cards, so 32-bit unsigned ints are plenty.
+CARD_INDEX_TYPECODE = "I"
+
+
+class CardModel:
+    """A single card on the board."""
+    __slots__ = ("label", "description", "details", "tags", "uid", "column", "index")
+
+    def __init__(self, label: str, description: str = "", details: str = "", tags: Tuple[str, ...] = (), uid: Optional[str] = None) -> None:
+        self.label = label
+        self.description = description
+        self.details = details
+        self.tags = tuple(sys.intern(tag) for tag in tags)
+        # Stable identity across machines; only assigned once sync is enabled.
+        self.uid = uid
+        # Set by BoardModel when the card is placed on the board.
+        self.column: Optional["ColumnModel"] = None
+        self.index = -1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the card in the JSON layout used by storage."""
+        data = {"label": self.label, "description": self.description, "details": self.details}
+        if self.tags:
+            data["tags"] = list(self.tags)
+        if self.uid is not None:
+            data["id"] = self.uid
+        return data
+
+
+class ColumnModel:
+    """A column on the board. Card order is kept as indexes into the board's card table."""
+    __slots__ = ("title", "card_indexes")
+
+    def __init__(self, title: str) -> None:
+        self.title = sys.intern(title)
+        self.card_indexes = array(CARD_INDEX_TYPECODE)
+
+    def __len__(self) -> int:
+        return len(self.card_indexes)
+
+
+class BoardModel:
+    """The whole board: columns in display order plus a shared card table."""
+    __slots__ = ("columns", "cards", "changed_cards", "columns_changed")
+
+    def __init__(self) -> None:
+        self.columns: List[ColumnModel] = []
+        # Removed cards leave a None behind so that indexes stay stable;
+        # the table is compacted the next time the board is loaded.
+        self.cards: List[Optional[CardModel]] = []
+        # Cards added, moved, edited or removed since the last drain_changes().
+        # None until track_changes() is called, so untracked boards pay nothing.
+        self.changed_cards: Optional[Set[CardModel]] = None
+        self.columns_changed = False
+
+    def track_changes(self) -> None:
+        """Starts recording which cards and columns change."""
+        if self.changed_cards is None:
+            self.changed_cards = set()
+
+    def drain_changes(self) -> Tuple[Set[CardModel], bool]:
+        """Returns (changed cards, whether the column list changed) and resets both."""
+        changes = (self.changed_cards or set(), self.columns_changed)
+        if self.changed_cards is not None:
+            self.changed_cards = set()
+        self.columns_changed = False
+        return changes
+
+    def _touch(self, card: CardModel) -> None:
+        if self.changed_cards is not None:
+            self.changed_cards.add(card)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BoardModel":
+        """Builds a board from the JSON layout used by storage."""
+        board = cls()
+        for column_data in data.get("columns", []):
+            column = board.add_column(column_data["title"])
+            for card_data in column_data.get("cards", []):
+                board.add_card(column, CardModel(
+                    label=card_data["label"],
+                    description=card_data.get("description", ""),
+                    details=card_data.get("details", ""),
+                    tags=card_data.get("tags", ()),
+                    uid=card_data.get("id"),
+                ))
+        return board
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the board in the JSON layout used by storage."""
+        return {
+            "columns": [
+                {"title": column.title, "cards": [card.to_dict() for card in self.iter_cards(column)]}
+                for column in self.columns
+            ]
+        }
+
+    def iter_cards(self, column: ColumnModel) -> Iterator[CardModel]:
+        """Yields the cards of a column in display order."""
+        cards = self.cards
+        for index in column.card_indexes:
+            yield cards[index]
+
+    def find_column(self, title: str) -> Optional[ColumnModel]:
+        """Returns the first column with the given title, if any."""
+        for column in self.columns:
+            if column.title == title:
+                return column
+        return None
+
+    def add_column(self, title: str) -> ColumnModel:
+        """Appends a new empty column."""
+        column = ColumnModel(title)
+        self.columns.append(column)
+        self.columns_changed = True
+        return column
+
+    def has_card(self, card: CardModel) -> bool:
+        """Returns True if the card is currently on this board."""
+        return 0 <= card.index < len(self.cards) and self.cards[card.index] is card
+
+    def remove_column(self, column: ColumnModel) -> None:
+        """Removes a column together with all of its cards. Does nothing if the column is not on the board."""
+        if column not in self.columns:
+            return
+        for index in column.card_indexes:
+            self._touch(self.cards[index])
+            self.cards[index].column = None
+            self.cards[index] = None
+        self.columns.remove(column)
+        self.columns_changed = True
+
+    def rename_column(self, column: ColumnModel, title: str) -> None:
+        """Gives a column a new title."""
+        column.title = sys.intern(title)
+        for card in self.iter_cards(column):
+            self._touch(card)
+        self.columns_changed = True
+
+    def add_card(self, column: ColumnModel, card: CardModel) -> CardModel:
+        """Appends a card to the end of a column."""
+        card.index = len(self.cards)
+        card.column = column
+        self.cards.append(card)
+        column.card_indexes.append(card.index)
+        self._touch(card)
+        return card
+
+    def remove_card(self, card: CardModel) -> None:
+        """Removes a card from its column and from the card table. Does nothing if the card is not on the board."""
+        if not self.has_card(card):
+            return
+        card.column.card_indexes.remove(card.index)
+        self.cards[card.index] = None
+        card.column = None
+        self._touch(card)
+
+    def move_card(self, card: CardModel, target: ColumnModel) -> None:
+        """
+        Moves a card to the end of another column. Does nothing if the card or
+        the column is no longer on the board, e.g. after a sync round removed it.
+        """
+        if not self.has_card(card) or target not in self.columns:
+            return
+        card.column.card_indexes.remove(card.index)
+        target.card_indexes.append(card.index)
+        card.column = target
+        self._touch(card)
+
+    def update_card(self, card: CardModel, label: str, description: str, details: str, tags: Optional[Tuple[str, ...]] = None) -> None:
+        """Replaces the text fields of a card in place. Tags are left alone unless given."""
+        card.label = label
+        card.description = description
+        card.details = details
+        if tags is not None:
+            card.tags = tuple(sys.intern(tag) for tag in tags)
+        self._touch(card)
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from model import BoardModel, CardModel
+
+# The directory where board snapshots are stored.
+SNAPSHOT_DIR = Path.home() / ".adp_planner_snapshots"
+
+# Seconds between automatic snapshots while the app is running.
+SNAPSHOT_INTERVAL = 3600.0
+
+# Average number of cards per chunk. A chunk ends after any card whose
+# checksum is a multiple of this, so boundaries depend only on nearby cards
+# and an edit, insert or delete changes one chunk (rarely two) instead of
+# shifting every chunk after it.
+CHUNK_CARDS = 128
+
+# Hard upper bound on cards per chunk, for runs of cards that never hit a
+# boundary (e.g. many identical cards).
+MAX_CHUNK_CARDS = 4 * CHUNK_CARDS
+
+# A board captured for snapshotting: (column title, card fields) pairs, where
+# card fields are (label, description, details, tags, uid). Everything in it
+# is immutable, so it can be written out from another thread.
+FrozenBoard = List[Tuple[str, Tuple[Tuple[Any, ...], ...]]]
+
+
+class SnapshotInfo(NamedTuple):
+    """One line of the snapshot index."""
+    digest: str
+    time: str
+    columns: int
+    cards: int
+
+
+def _encode(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def freeze_board(board: BoardModel) -> FrozenBoard:
+    """Captures the board's current contents without copying any text."""
+    return [
+        (column.title, tuple(
+            (card.label, card.description, card.details, card.tags, card.uid)
+            for card in board.iter_cards(column)
+        ))
+        for column in board.columns
+    ]
+
+
+def _encode_cards(cards: Tuple[Tuple[Any, ...], ...]) -> List[bytes]:
+    return [
+        _encode(CardModel(label, description, details, tags, uid).to_dict())
+        for label, description, details, tags, uid in cards
+    ]
+
+
+def _chunks(encoded: List[bytes]) -> List[bytes]:
+    """
+    Splits a column's encoded cards into content-defined chunks. Each chunk
+    is the JSON of {"cards": [...]}, built from the already encoded cards.
+    """
+    chunks = []
+    start = 0
+    for i, card in enumerate(encoded):
+        if zlib.crc32(card) % CHUNK_CARDS == 0 or i + 1 - start >= MAX_CHUNK_CARDS:
+            chunks.append(b'{"cards":[' + b",".join(encoded[start:i + 1]) + b"]}")
+            start = i + 1
+    if start < len(encoded):
+        chunks.append(b'{"cards":[' + b",".join(encoded[start:]) + b"]}")
+    return chunks
+
+
+class SnapshotStore:
+    """
+    A content-addressed store of board snapshots.
+
+    Every object is stored once under the SHA-256 of its JSON. A column's
+    cards are split into content-defined chunks (see CHUNK_CARDS); a column
+    object lists its chunks by digest, and a snapshot object lists its
+    columns by digest. Unchanged chunks and columns are shared between
+    snapshots, so editing one card stores one new chunk plus a small column
+    and snapshot object. A small index file lists snapshots in the order
+    they were taken, so they can be listed without reading any of them.
+    """
+
+    def __init__(self, root: Path = SNAPSHOT_DIR) -> None:
+        self.root = root
+        self.objects = root / "objects"
+        self.index_file = root / "index.jsonl"
+        # Digests known to be on disk, to skip repeated existence checks.
+        self._known = set()
+        # Snapshots are written from worker threads; one at a time.
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def _put(self, obj: Any) -> str:
+        return self._put_bytes(_encode(obj))
+
+    def _put_bytes(self, data: bytes) -> str:
+        digest = _digest(data)
+        if digest in self._known:
+            return digest
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary name first so a crash never leaves a
+            # truncated object under a valid digest.
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(zlib.compress(data))
+            tmp.replace(path)
+        self._known.add(digest)
+        return digest
+
+    def _get(self, digest: str) -> Any:
+        return json.loads(zlib.decompress(self._path(digest).read_bytes()))
+
+    def _put_column(self, title: str, cards: Tuple[Tuple[Any, ...], ...]) -> str:
+        chunks = [self._put_bytes(chunk) for chunk in _chunks(_encode_cards(cards))]
+        return self._put({"title": title, "chunks": chunks})
+
+    def take(self, board: BoardModel) -> Optional[SnapshotInfo]:
+        """Stores a snapshot of the board. See take_frozen()."""
+        return self.take_frozen(freeze_board(board))
+
+    def take_frozen(self, frozen: FrozenBoard) -> Optional[SnapshotInfo]:
+        """
+        Stores a snapshot of a board captured with freeze_board(). Safe to
+        call from a worker thread.
+        Returns None without recording anything if the board is unchanged
+        since the latest snapshot.
+        """
+        with self._lock:
+            columns = [
+                {"title": title, "digest": self._put_column(title, cards), "cards": len(cards)}
+                for title, cards in frozen
+            ]
+            digest = self._put({"columns": columns})
+            latest = self.latest()
+            if latest is not None and latest.digest == digest:
+                return None
+            info = SnapshotInfo(
+                digest=digest,
+                time=datetime.now().isoformat(timespec="seconds"),
+                columns=len(columns),
+                cards=sum(column["cards"] for column in columns),
+            )
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self.index_file.open("a") as f:
+                f.write(json.dumps(info._asdict()) + "\n")
+            return info
+
+    def list_snapshots(self) -> List[SnapshotInfo]:
+        """Returns all snapshots, newest first, reading only the index."""
+        if not self.index_file.exists():
+            return []
+        snapshots = []
+        with self.index_file.open("r") as f:
+            for line in f:
+                try:
+                    snapshots.append(SnapshotInfo(**json.loads(line)))
+                except (json.JSONDecodeError, TypeError):
+                    # Skip a line left half-written by a crash.
+                    continue
+        snapshots.reverse()
+        return snapshots
+
+    def latest(self) -> Optional[SnapshotInfo]:
+        """Returns the most recent snapshot, if any."""
+        snapshots = self.list_snapshots()
+        return snapshots[0] if snapshots else None
+
+    def columns(self, digest: str) -> List[Dict[str, Any]]:
+        """Returns the columns of a snapshot as {"title", "digest", "cards": count}, without their cards."""
+        return self._get(digest)["columns"]
+
+    def diff_summary(self, digest: str, frozen: FrozenBoard) -> List[str]:
+        """
+        Describes how a snapshot differs from a board captured with
+        freeze_board(), one line per column. Cards are compared by content,
+        so an edited card counts as one removed and one added. Only chunks
+        that are not on both sides are read. Safe to call from a worker thread.
+        """
+        snapshot_columns = {column["title"]: column for column in self.columns(digest)}
+        board_columns = {title: cards for title, cards in frozen}
+        lines = []
+        for title in list(snapshot_columns) + [title for title in board_columns if title not in snapshot_columns]:
+            if title not in board_columns:
+                lines.append(f"{title}: column only in snapshot ({snapshot_columns[title]['cards']} cards)")
+            elif title not in snapshot_columns:
+                lines.append(f"{title}: column not in snapshot ({len(board_columns[title])} cards)")
+            else:
+                chunks = _chunks(_encode_cards(board_columns[title]))
+                digests = [_digest(chunk) for chunk in chunks]
+                chunk_data = dict(zip(digests, chunks))
+                board_chunks = Counter(digests)
+                snapshot_chunks = Counter(self._get(snapshot_columns[title]["digest"])["chunks"])
+                # Chunks present on both sides hold the same cards and cancel out.
+                shared = board_chunks & snapshot_chunks
+                snapshot_cards = Counter()
+                for chunk in (snapshot_chunks - shared).elements():
+                    snapshot_cards.update(map(_encode, self._get(chunk)["cards"]))
+                board_cards = Counter()
+                for chunk in (board_chunks - shared).elements():
+                    board_cards.update(map(_encode, json.loads(chunk_data[chunk])["cards"]))
+                removed = sum((snapshot_cards - board_cards).values())
+                added = sum((board_cards - snapshot_cards).values())
+                if removed or added:
+                    lines.append(f"{title}: {removed} cards only in snapshot, {added} only on board")
+        return lines
+
+    def _cards(self, column_digest: str) -> List[CardModel]:
+        return [
+            CardModel(
+                label=card["label"],
+                description=card.get("description", ""),
+                details=card.get("details", ""),
+                tags=card.get("tags", ()),
+                uid=card.get("id"),
+            )
+            for chunk in self._get(column_digest)["chunks"]
+            for card in self._get(chunk)["cards"]
+        ]
+
+    def restore(self, digest: str) -> BoardModel:
+        """Builds a new board from a snapshot."""
+        board = BoardModel()
+        for column_data in self.columns(digest):
+            column = board.add_column(column_data["title"])
+            for card in self._cards(column_data["digest"]):
+                board.add_card(column, card)
+        return board
+
+    def load_column(self, digest: str, index: int) -> Tuple[str, List[CardModel]]:
+        """Returns the title and cards of one column of a snapshot. Safe to call from a worker thread."""
+        column_data = self.columns(digest)[index]
+        return column_data["title"], self._cards(column_data["digest"])
+
+    def restore_column(self, digest: str, index: int, board: BoardModel) -> None:
+        """Restores one column of a snapshot into the board. See replace_column()."""
+        replace_column(board, *self.load_column(digest, index))
+
+
+def replace_column(board: BoardModel, title: str, cards: List[CardModel]) -> None:
+    """
+    Replaces the cards of the board's column with the given title, adding
+    the column if it is gone. A card that has since moved to another column
+    is taken out of that column, so no uid is ever on the board twice.
+    """
+    column = board.find_column(title)
+    if column is None:
+        column = board.add_column(title)
+    for card in list(board.iter_cards(column)):
+        board.remove_card(card)
+    by_uid = {card.uid: card for card in board.cards if card is not None and card.uid is not None}
+    for card in cards:
+        if card.uid in by_uid:
+            board.remove_card(by_uid.pop(card.uid))
+        board.add_card(column, card)
@@ -1,6 +1,9 @@
 import json
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, TextIO
+
+from model import BoardModel
 
 # The path to the file where the board data will be stored.
 DATA_FILE = Path.home() / ".adp_planner_board.json"
@@ -15,24 +18,61 @@ def get_default_data() -> Dict[str, Any]:
         ]
     }
 
-def load_board() -> Dict[str, Any]:
+def _corrupt_path() -> Path:
+    """Returns an unused name to keep a corrupted board file under."""
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    path = DATA_FILE.with_name(f"{DATA_FILE.name}.corrupt-{stamp}")
+    count = 1
+    while path.exists():
+        count += 1
+        path = DATA_FILE.with_name(f"{DATA_FILE.name}.corrupt-{stamp}-{count}")
+    return path
+
+def load_board() -> BoardModel:
     """
     Loads the board data from the JSON file.
     If the file doesn't exist, it creates a default board.
     """
     if not DATA_FILE.exists():
-        board_data = get_default_data()
-        save_board(board_data)
-        return board_data
-    
+        board = BoardModel.from_dict(get_default_data())
+        save_board(board)
+        return board
+
     with DATA_FILE.open("r") as f:
         try:
-            return json.load(f)
+            return BoardModel.from_dict(json.load(f))
         except json.JSONDecodeError:
-            # If the file is corrupted or empty, return default data
-            return get_default_data()
+            pass
+    # If the file is corrupted or empty, keep it aside so the next save does
+    # not destroy it, and return default data. Earlier versions of the board
+    # can be restored from the snapshot history.
+    DATA_FILE.replace(_corrupt_path())
+    return BoardModel.from_dict(get_default_data())
+
+def _indent(text: str, prefix: str) -> str:
+    return text.replace("\n", "\n" + prefix)
+
+def write_board(board: BoardModel, f: TextIO) -> None:
+    """
+    Streams the board to a file one card at a time.
+    The output is identical to json.dump(board.to_dict(), f, indent=4), but no
+    intermediate dicts are built for the whole board.
+    """
+    f.write('{\n    "columns": [')
+    for column_index, column in enumerate(board.columns):
+        f.write(",\n        {" if column_index else "\n        {")
+        f.write('\n            "title": ' + json.dumps(column.title) + ",")
+        if not len(column):
+            f.write('\n            "cards": []\n        }')
+            continue
+        f.write('\n            "cards": [')
+        for card_index, card in enumerate(board.iter_cards(column)):
+            f.write(",\n                " if card_index else "\n                ")
+            f.write(_indent(json.dumps(card.to_dict(), indent=4), "                "))
+        f.write("\n            ]\n        }")
+    f.write("\n    ]\n}" if board.columns else "]\n}")
 
-def save_board(data: Dict[str, Any]) -> None:
-    """Saves the entire board data to the JSON file."""
+def save_board(board: BoardModel) -> None:
+    """Saves the entire board to the JSON file."""
     with DATA_FILE.open("w") as f:
-        json.dump(data, f, indent=4)
+        write_board(board, f)
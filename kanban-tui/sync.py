@@ -0,0 +1,438 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.request import Request, urlopen
+
+from model import BoardModel, CardModel, ColumnModel
+
+# The path to the file where sync bookkeeping (replica id, version vectors,
+# unacknowledged deltas) is stored, next to the board file.
+SYNC_STATE_FILE = Path.home() / ".adp_planner_sync.json"
+
+# Seconds between sync rounds while the app is running.
+SYNC_INTERVAL = 5.0
+
+# Seconds before an HTTP request to the sync server is abandoned.
+REQUEST_TIMEOUT = 10.0
+
+# Record key for the board's column order. Card records use "card:<uid>".
+COLUMNS_KEY = "columns"
+
+# A record is (version vector, origin replica, value hash). The hash is None
+# for a deleted card. Only the hash is kept, not the value, so sync does not
+# hold a second copy of every card's text.
+Record = Tuple[Dict[str, int], str, Optional[str]]
+
+
+def compare_versions(a: Dict[str, int], b: Dict[str, int]) -> str:
+    """
+    Compares two version vectors.
+    Returns "equal", "before" (a happened before b), "after" or "concurrent".
+    """
+    a_ahead = any(count > b.get(replica, 0) for replica, count in a.items())
+    b_ahead = any(count > a.get(replica, 0) for replica, count in b.items())
+    if a_ahead and b_ahead:
+        return "concurrent"
+    if a_ahead:
+        return "after"
+    if b_ahead:
+        return "before"
+    return "equal"
+
+
+def merge_versions(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    """Returns the element-wise maximum of two version vectors."""
+    merged = dict(a)
+    for replica, count in b.items():
+        if count > merged.get(replica, 0):
+            merged[replica] = count
+    return merged
+
+
+def remote_wins(local_deleted: bool, local_origin: str, remote_deleted: bool, remote_origin: str) -> bool:
+    """
+    Decides a conflict between two concurrent versions of the same record.
+    An edit beats a delete so no work is lost; otherwise the version written
+    by the larger replica id wins. Every replica reaches the same answer.
+    """
+    if local_deleted != remote_deleted:
+        return local_deleted
+    return remote_origin > local_origin
+
+
+def value_hash(value: Any) -> Optional[str]:
+    """Returns a short digest of a record value, or None for a deletion."""
+    if value is None:
+        return None
+    data = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _card_value(card: CardModel) -> Dict[str, Any]:
+    return {
+        "label": card.label,
+        "description": card.description,
+        "details": card.details,
+        "tags": list(card.tags),
+        "column": card.column.title,
+    }
+
+
+class SyncEngine:
+    """
+    Keeps a BoardModel in sync with a remote board server.
+
+    Local changes come from the board's own change tracking, so each round
+    only looks at cards that were touched since the last one. Changes made
+    between rounds are batched into one delta per card. Each record carries
+    a version vector, and concurrent edits to the same card are resolved
+    with remote_wins(). When the app replaces its board (clear, restore) the
+    new board is compared against the records once in full.
+    """
+
+    def __init__(self, url: str, state_file: Path = SYNC_STATE_FILE) -> None:
+        self.url = url.rstrip("/")
+        self.state_file = state_file
+        self.replica = uuid.uuid4().hex
+        # Identifies one run of the server; a new epoch means its log was lost.
+        self.epoch: Optional[str] = None
+        # Server version of the last delta pulled; pulls resume from here.
+        self.last_version = 0
+        # Number of the last batch sent, used by the server to drop resends.
+        self.batch = 0
+        # Keys of records changed locally but not yet acknowledged by the server.
+        self.outbox: Set[str] = set()
+        # The batch currently being sent. It is resent unchanged until acknowledged.
+        self.inflight: Optional[List[Dict[str, Any]]] = None
+        # Last synced version of every record.
+        self.records: Dict[str, Record] = {}
+        # The column list is small, so its value is kept alongside its record.
+        self.column_titles: List[str] = []
+        # The board being synced and its cards by uid. Rebuilt when the app
+        # hands over a different board.
+        self._board: Optional[BoardModel] = None
+        self._cards: Dict[str, CardModel] = {}
+        # Set when the server lost its log and everything must be sent again.
+        self._resend_all = False
+        self.load_state()
+
+    def load_state(self) -> None:
+        """Restores sync bookkeeping saved by a previous session."""
+        if not self.state_file.exists():
+            return
+        with self.state_file.open("r") as f:
+            try:
+                state = json.load(f)
+            except json.JSONDecodeError:
+                return
+        if state.get("url") != self.url or "epoch" not in state:
+            # A different server has its own version numbering, and state
+            # from an older layout cannot be trusted either.
+            self.replica = state.get("replica", self.replica)
+            return
+        self.replica = state["replica"]
+        self.epoch = state["epoch"]
+        self.last_version = state["last_version"]
+        self.batch = state["batch"]
+        self.outbox = set(state["outbox"])
+        self.inflight = state["inflight"]
+        self.records = {key: tuple(record) for key, record in state["records"].items()}
+        self.column_titles = state["column_titles"]
+
+    def _state(self) -> Dict[str, Any]:
+        # Records are immutable tuples, so shallow copies are a consistent
+        # snapshot that can be written out while the board keeps changing.
+        return {
+            "url": self.url,
+            "replica": self.replica,
+            "epoch": self.epoch,
+            "last_version": self.last_version,
+            "batch": self.batch,
+            "outbox": list(self.outbox),
+            "inflight": self.inflight,
+            "records": dict(self.records),
+            "column_titles": list(self.column_titles),
+        }
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+        with tmp.open("w") as f:
+            json.dump(state, f)
+        tmp.replace(self.state_file)
+
+    async def save_state(self) -> None:
+        """Saves sync bookkeeping so a restart resumes where it left off."""
+        await asyncio.to_thread(self._write_state, self._state())
+
+    def _bump(self, key: str, digest: Optional[str]) -> None:
+        vv = dict(self.records[key][0]) if key in self.records else {}
+        vv[self.replica] = vv.get(self.replica, 0) + 1
+        self.records[key] = (vv, self.replica, digest)
+        self.outbox.add(key)
+
+    def _record_card(self, card: CardModel) -> int:
+        if card.column is None:
+            if card.uid is None:
+                # Added and removed again before sync ever saw it.
+                return 0
+            if self._cards.get(card.uid, card) is not card:
+                # Another card on the board has taken over this uid.
+                return 0
+            self._cards.pop(card.uid, None)
+            digest = None
+        else:
+            if card.uid is None:
+                card.uid = uuid.uuid4().hex
+            self._cards[card.uid] = card
+            digest = value_hash(_card_value(card))
+        key = "card:" + card.uid
+        record = self.records.get(key)
+        if (record[2] if record else None) == digest:
+            return 0
+        self._bump(key, digest)
+        return 1
+
+    def _record_columns(self, board: BoardModel) -> int:
+        titles = [column.title for column in board.columns]
+        if COLUMNS_KEY in self.records and titles == self.column_titles:
+            return 0
+        self.column_titles = titles
+        self._bump(COLUMNS_KEY, value_hash(titles))
+        return 1
+
+    def _reconcile(self, board: BoardModel) -> int:
+        """Compares a board the engine has not seen before against the records."""
+        board.track_changes()
+        board.drain_changes()
+        self._board = board
+        self._cards = {}
+        changed = 0
+        for column in board.columns:
+            for card in board.iter_cards(column):
+                changed += self._record_card(card)
+        for key, (_, _, digest) in list(self.records.items()):
+            if key.startswith("card:") and digest is not None and key[len("card:"):] not in self._cards:
+                self._bump(key, None)
+                changed += 1
+        changed += self._record_columns(board)
+        if self._resend_all:
+            self._resend_all = False
+            self.outbox.update(self.records)
+        return changed
+
+    def record_local(self, board: BoardModel) -> int:
+        """
+        Queues a delta for every card or column list changed since the last
+        call. Cards without a uid get one. Returns the number of deltas queued.
+        """
+        if board is not self._board:
+            return self._reconcile(board)
+        cards, columns_changed = board.drain_changes()
+        changed = sum(self._record_card(card) for card in cards)
+        if columns_changed:
+            changed += self._record_columns(board)
+        return changed
+
+    def apply_remote(self, board: BoardModel, deltas: List[Dict[str, Any]]) -> int:
+        """
+        Applies deltas pulled from the server to the board.
+        Returns the number of deltas that changed the board.
+        """
+        # Pick up any edits made since the last round so they take part in
+        # conflict resolution instead of being overwritten.
+        self.record_local(board)
+        applied = 0
+        columns_changed = False
+        for delta in deltas:
+            if delta["key"] == COLUMNS_KEY:
+                columns_changed = self._resolve(delta) or columns_changed
+            elif self._resolve(delta) and self._apply_card(board, delta["key"][len("card:"):], delta["value"]):
+                applied += 1
+        # Columns go last so that columns emptied by card moves can be dropped.
+        if columns_changed:
+            self._apply_columns(board, self.column_titles)
+            applied += 1
+        # Applying remote values touched the board; those are not local changes.
+        self.record_local(board)
+        return applied
+
+    def _resolve(self, delta: Dict[str, Any]) -> bool:
+        """Merges a remote delta into the records. Returns True if the board should take its value."""
+        key = delta["key"]
+        remote_digest = value_hash(delta["value"])
+        local = self.records.get(key)
+        if local is None:
+            self.records[key] = (delta["vv"], delta["origin"], remote_digest)
+            if key == COLUMNS_KEY:
+                self.column_titles = delta["value"]
+            # A deletion of a card this replica never had changes nothing.
+            return delta["value"] is not None
+        local_vv, local_origin, local_digest = local
+        order = compare_versions(local_vv, delta["vv"])
+        if order in ("equal", "after"):
+            return False
+        vv = merge_versions(local_vv, delta["vv"])
+        if order == "concurrent" and key == COLUMNS_KEY:
+            return self._merge_columns(vv, local_origin, delta)
+        if order == "concurrent" and not remote_wins(local_digest is None, local_origin, delta["value"] is None, delta["origin"]):
+            self.records[key] = (vv, local_origin, local_digest)
+            return False
+        self.records[key] = (vv, delta["origin"], remote_digest)
+        if key == COLUMNS_KEY:
+            self.column_titles = delta["value"]
+        # A newer remote version supersedes anything still queued for this record.
+        self.outbox.discard(key)
+        return True
+
+    def _merge_columns(self, vv: Dict[str, int], local_origin: str, delta: Dict[str, Any]) -> bool:
+        """
+        Merges concurrent column lists instead of dropping one: the winner's
+        order, followed by any titles only the loser had.
+        """
+        if remote_wins(False, local_origin, False, delta["origin"]):
+            winner, loser, origin = delta["value"], self.column_titles, delta["origin"]
+        else:
+            winner, loser, origin = self.column_titles, delta["value"], local_origin
+        self.column_titles = winner + [title for title in loser if title not in winner]
+        self.records[COLUMNS_KEY] = (vv, origin, value_hash(self.column_titles))
+        return True
+
+    def _apply_card(self, board: BoardModel, uid: str, value: Optional[Dict[str, Any]]) -> bool:
+        card = self._cards.get(uid)
+        if value is None:
+            if card is None:
+                return False
+            board.remove_card(card)
+            del self._cards[uid]
+            return True
+        column = board.find_column(value["column"])
+        if column is None:
+            column = board.add_column(value["column"])
+        if card is None:
+            self._cards[uid] = board.add_card(column, CardModel(
+                label=value["label"],
+                description=value["description"],
+                details=value["details"],
+                tags=value["tags"],
+                uid=uid,
+            ))
+            return True
+        board.update_card(card, value["label"], value["description"], value["details"], value["tags"])
+        if card.column is not column:
+            board.move_card(card, column)
+        return True
+
+    def _apply_columns(self, board: BoardModel, titles: List[str]) -> None:
+        remaining = list(board.columns)
+        ordered = []
+        for title in titles:
+            for column in remaining:
+                if column.title == title:
+                    remaining.remove(column)
+                    break
+            else:
+                column = ColumnModel(title)
+            ordered.append(column)
+        # Never drop a column that still holds cards.
+        ordered.extend(column for column in remaining if len(column))
+        board.columns[:] = ordered
+        board.columns_changed = True
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> Dict[str, Any]:
+        request = Request(self.url + path, data=body, method=method, headers={"Content-Type": "application/json"})
+        with urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            return json.load(response)
+
+    def _delta(self, key: str) -> Dict[str, Any]:
+        vv, origin, digest = self.records[key]
+        if key == COLUMNS_KEY:
+            value = self.column_titles
+        else:
+            card = self._cards.get(key[len("card:"):]) if digest is not None else None
+            value = _card_value(card) if card is not None else None
+        return {"key": key, "vv": vv, "origin": origin, "value": value}
+
+    def start_batch(self) -> bool:
+        """
+        Moves the queued deltas into a new numbered batch, unless one is still
+        awaiting acknowledgement. Returns True if a new batch was started.
+        """
+        if self.inflight is not None or not self.outbox:
+            return False
+        self.batch += 1
+        self.inflight = [self._delta(key) for key in self.outbox]
+        return True
+
+    async def push(self) -> int:
+        """Sends the in-flight batch to the server. Returns the number of deltas sent."""
+        if self.inflight is None:
+            return 0
+        deltas = self.inflight
+        body = json.dumps({"replica": self.replica, "batch": self.batch, "deltas": deltas}).encode()
+        response = await asyncio.to_thread(self._request, "POST", "/deltas", body)
+        self.inflight = None
+        for delta in deltas:
+            # Only clear entries that were not changed again while the request was in flight.
+            record = self.records.get(delta["key"])
+            if record is not None and record[0] == delta["vv"]:
+                self.outbox.discard(delta["key"])
+        self._check_epoch(response)
+        return len(deltas)
+
+    def _check_epoch(self, response: Dict[str, Any]) -> bool:
+        """
+        Detects a server that lost its log (e.g. restarted). Pulls then start
+        over from version 0 and every record is sent again. Returns True if
+        that happened.
+        """
+        epoch = response["epoch"]
+        if epoch == self.epoch:
+            return False
+        restarted = self.epoch is not None
+        self.epoch = epoch
+        if restarted:
+            # The batch counter keeps counting up: the push that revealed
+            # the restart may already have been accepted under its number.
+            self.last_version = 0
+            self._resend_all = True
+            # Compare the board in full on the next round, which requeues everything.
+            self._board = None
+        return restarted
+
+    async def pull(self) -> List[Dict[str, Any]]:
+        """Fetches every delta the server has accepted since the last pull."""
+        deltas = []
+        while True:
+            response = await asyncio.to_thread(self._request, "GET", f"/deltas?since={self.last_version}")
+            if self._check_epoch(response):
+                # The page was computed against the old position; ask again from the start.
+                deltas = []
+                continue
+            deltas.extend(response["deltas"])
+            self.last_version = response["version"]
+            if not response.get("more"):
+                return deltas
+
+    async def sync(self, current_board: Callable[[], BoardModel]) -> Tuple[int, int]:
+        """
+        Runs one sync round: record local changes, push them, then pull and
+        apply remote ones. current_board is called again after every await,
+        so remote changes land on the board the app holds at that moment even
+        if it was replaced meanwhile. Network errors propagate and leave
+        unacknowledged deltas queued for the next round.
+        Returns (deltas pushed, remote deltas applied).
+        """
+        self.record_local(current_board())
+        if self.start_batch():
+            # Persist the batch before sending it, so that after a crash it is
+            # resent under the same number rather than a reused one.
+            await self.save_state()
+        pushed = await self.push()
+        deltas = await self.pull()
+        applied = self.apply_remote(current_board(), deltas)
+        if pushed or deltas:
+            await self.save_state()
+        return pushed, applied
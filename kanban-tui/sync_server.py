@@ -0,0 +1,116 @@
+"""
+A small reference board server for sync.py.
+
+It keeps an append-only log of deltas in memory and hands them out by
+version number. Conflict resolution happens on the clients, so the server
+never looks inside a delta. Each run gets a new epoch id; clients that see
+it change start over and send their whole board again. Run it with:
+
+    python sync_server.py --port 8765
+
+and start the app with ADP_PLANNER_SYNC_URL=http://localhost:8765.
+"""
+import argparse
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Maximum number of deltas returned by a single pull.
+PAGE_SIZE = 500
+
+
+class DeltaLog:
+    """The server's record of every delta it has accepted, in order."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Changes every time the log starts empty, so clients can tell that
+        # their last known version no longer means anything.
+        self.epoch = uuid.uuid4().hex
+        self._deltas: List[Dict[str, Any]] = []
+        # Highest batch number accepted from each replica.
+        self._batches: Dict[str, int] = {}
+
+    @property
+    def version(self) -> int:
+        return len(self._deltas)
+
+    def append(self, replica: str, batch: int, deltas: List[Dict[str, Any]]) -> int:
+        """Accepts a batch of deltas. Batches that were already accepted are ignored."""
+        with self._lock:
+            if batch > self._batches.get(replica, 0):
+                self._batches[replica] = batch
+                self._deltas.extend(deltas)
+            return self.version
+
+    def since(self, version: int) -> Tuple[int, List[Dict[str, Any]], bool]:
+        """Returns (new version, deltas after version, whether more are waiting)."""
+        with self._lock:
+            page = self._deltas[version:version + PAGE_SIZE]
+            new_version = version + len(page)
+            return new_version, page, new_version < self.version
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /deltas?since=N and POST /deltas."""
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/deltas":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            since = int(parse_qs(url.query).get("since", ["0"])[0])
+        except ValueError:
+            self._send_json(400, {"error": "since must be an integer"})
+            return
+        version, deltas, more = self.server.log.since(since)
+        self._send_json(200, {"epoch": self.server.log.epoch, "version": version, "deltas": deltas, "more": more})
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != "/deltas":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length))
+            version = self.server.log.append(request["replica"], request["batch"], request["deltas"])
+        except (json.JSONDecodeError, KeyError, TypeError):
+            self._send_json(400, {"error": "malformed batch"})
+            return
+        self._send_json(200, {"epoch": self.server.log.epoch, "version": version})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep the terminal quiet; the app polls every few seconds.
+        pass
+
+
+class SyncServer(ThreadingHTTPServer):
+    """An HTTP server holding one shared DeltaLog."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int]) -> None:
+        super().__init__(address, SyncRequestHandler)
+        self.log = DeltaLog()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reference sync server for adp-planner.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = SyncServer((args.host, args.port))
+    print(f"Serving adp-planner sync on http://{args.host}:{args.port}")
+    server.serve_forever()
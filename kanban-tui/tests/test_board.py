@@ -6,6 +6,7 @@ from unittest.mock import patch, MagicMock
 from copy import deepcopy
 
 from board import KanbanApp, Card, Column, AddCardScreen
+from model import BoardModel
 
 # Mock initial board data for tests
 MOCK_INITIAL_BOARD_DATA = {
@@ -17,13 +18,14 @@ MOCK_INITIAL_BOARD_DATA = {
 }
 
 @pytest.mark.asyncio
-@patch('storage.load_board', return_value=deepcopy(MOCK_INITIAL_BOARD_DATA))
+@patch('board.load_board', side_effect=lambda: BoardModel.from_dict(deepcopy(MOCK_INITIAL_BOARD_DATA)))
 @patch('board.save_board')
-async def test_add_card(mock_save_board, mock_load_board):
+@patch('board.SnapshotStore')
+async def test_add_card(mock_snapshot_store, mock_save_board, mock_load_board):
     """Test adding a new card via the UI."""
     async with KanbanApp().run_test() as driver:
         app = driver.app
-        await app.query(Column).wait_for_ready() # Wait for the initial columns to be rendered
+        await driver.pause() # Wait for the initial columns to be rendered
 
         # 1. Simulate pressing 'a' to open the Add Card dialog
         await driver.press("a")
@@ -52,7 +54,7 @@ async def test_add_card(mock_save_board, mock_load_board):
         assert new_card.label == "New Card Title"
         assert new_card.description == "This is a new card description"
 
-        # 5. Assert that the board_data in the KanbanApp instance has been updated
+        # 5. Assert that the board model in the KanbanApp instance has been updated
         expected_board_data = {
             "columns": [
                 {"title": "Input Queue", "cards": [
@@ -62,7 +64,8 @@ async def test_add_card(mock_save_board, mock_load_board):
                 {"title": "Done", "cards": []},
             ]
         }
-        assert app.board_data == expected_board_data
+        assert app.board.to_dict() == expected_board_data
+        assert new_card.model is next(app.board.iter_cards(app.board.columns[0]))
 
-        # 6. Assert that save_board was called with the updated data
-        mock_save_board.assert_called_once_with(expected_board_data)
\ No newline at end of file
+        # 6. Assert that save_board was called with the updated model
+        mock_save_board.assert_called_once_with(app.board)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import tracemalloc
+
+from model import BoardModel, CardModel, CARD_MEMORY_BUDGET
+
+MOCK_BOARD = {
+    "columns": [
+        {"title": "Input Queue", "cards": [
+            {"label": "First", "description": "", "details": "", "id": "card-1"},
+            {"label": "Second", "description": "Tagged", "details": "", "tags": ["urgent"]},
+        ]},
+        {"title": "Done", "cards": []},
+    ]
+}
+
+def test_round_trip():
+    """Tests that a board survives conversion to and from the storage layout."""
+    assert BoardModel.from_dict(MOCK_BOARD).to_dict() == MOCK_BOARD
+
+def test_move_and_remove_card():
+    """Tests that moving and removing cards keeps column order consistent."""
+    board = BoardModel.from_dict(MOCK_BOARD)
+    input_queue, done = board.columns
+    first, second = board.iter_cards(input_queue)
+
+    board.move_card(first, done)
+    assert list(board.iter_cards(input_queue)) == [second]
+    assert list(board.iter_cards(done)) == [first]
+    assert first.column is done
+
+    board.remove_card(second)
+    assert len(input_queue) == 0
+    assert second.column is None
+
+def test_detached_models_are_ignored():
+    """Tests that removing or moving cards and columns no longer on the board does nothing."""
+    board = BoardModel.from_dict(MOCK_BOARD)
+    input_queue, done = board.columns
+    first, second = board.iter_cards(input_queue)
+
+    board.remove_card(first)
+    board.remove_card(first)
+    board.move_card(first, done)
+    board.remove_column(done)
+    board.remove_column(done)
+    board.move_card(second, done)
+
+    assert board.columns == [input_queue]
+    assert list(board.iter_cards(input_queue)) == [second]
+    assert second.column is input_queue
+
+def test_strings_are_interned():
+    """Tests that column titles and tags are shared between instances."""
+    a = BoardModel.from_dict({"columns": [{"title": "".join(["In ", "Progress"]), "cards": []}]})
+    b = BoardModel.from_dict({"columns": [{"title": "".join(["In ", "Prog", "ress"]), "cards": []}]})
+    assert a.columns[0].title is b.columns[0].title
+    assert CardModel("x", tags=["".join(["bu", "g"])]).tags[0] is CardModel("y", tags=["".join(["b", "ug"])]).tags[0]
+
+def test_card_memory_budget():
+    """Tests that per-card overhead at 100k cards stays under CARD_MEMORY_BUDGET."""
+    count = 100_000
+    label = "card"
+    board = BoardModel()
+    column = board.add_column("Input Queue")
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(count):
+            board.add_card(column, CardModel(label))
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    per_card = (after - before) / count
+    assert per_card < CARD_MEMORY_BUDGET, f"{per_card:.1f} bytes per card"
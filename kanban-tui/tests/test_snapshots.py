@@ -0,0 +1,97 @@
+from model import BoardModel, CardModel
+from snapshots import CHUNK_CARDS, SnapshotStore, freeze_board
+
+MOCK_BOARD = {
+    "columns": [
+        {"title": "Input Queue", "cards": [
+            {"label": "First", "description": "", "details": ""},
+            {"label": "Second", "description": "", "details": "Some details"},
+        ]},
+        {"title": "Done", "cards": [
+            {"label": "Finished", "description": "", "details": ""},
+        ]},
+    ]
+}
+
+def _object_count(store):
+    return sum(1 for path in store.objects.rglob("*") if path.is_file())
+
+def test_snapshot_round_trip(tmp_path):
+    """Tests that a snapshot restores the board it was taken from."""
+    store = SnapshotStore(tmp_path)
+    info = store.take(BoardModel.from_dict(MOCK_BOARD))
+    assert info.cards == 3
+    assert store.restore(info.digest).to_dict() == MOCK_BOARD
+
+def test_unchanged_data_is_shared(tmp_path):
+    """Tests that unchanged boards, columns and chunks are stored only once."""
+    store = SnapshotStore(tmp_path)
+    board = BoardModel.from_dict(MOCK_BOARD)
+    store.take(board)
+    objects = _object_count(store)
+
+    assert store.take(board) is None
+    assert len(store.list_snapshots()) == 1
+
+    board.add_card(board.columns[1], CardModel("Another"))
+    store.take(board)
+    # Only the changed chunk, the Done column and the new snapshot object are written.
+    assert _object_count(store) == objects + 3
+    assert len(store.list_snapshots()) == 2
+
+def test_edits_write_one_chunk(tmp_path):
+    """Tests that a large column is split into chunks and an edit rewrites only a few objects."""
+    store = SnapshotStore(tmp_path)
+    board = BoardModel()
+    column = board.add_column("Input Queue")
+    for i in range(10 * CHUNK_CARDS):
+        board.add_card(column, CardModel(f"Card {i}"))
+    store.take(board)
+    objects = _object_count(store)
+    assert 3 < objects < 10 * 4
+
+    cards = list(board.iter_cards(column))
+    board.update_card(cards[5 * CHUNK_CARDS], "Edited", "", "")
+    store.take(board)
+    # One or two chunks around the edit, plus the column and snapshot objects.
+    assert _object_count(store) - objects <= 4
+
+    objects = _object_count(store)
+    board.remove_card(cards[2 * CHUNK_CARDS])
+    store.take(board)
+    assert _object_count(store) - objects <= 4
+
+def test_diff_summary_and_column_restore(tmp_path):
+    """Tests the diff summary and restoring a single column."""
+    store = SnapshotStore(tmp_path)
+    board = BoardModel.from_dict(MOCK_BOARD)
+    digest = store.take(board).digest
+    assert store.diff_summary(digest, freeze_board(board)) == []
+
+    input_queue, done = board.columns
+    board.remove_card(next(board.iter_cards(input_queue)))
+    board.remove_column(done)
+    assert store.diff_summary(digest, freeze_board(board)) == [
+        "Input Queue: 1 cards only in snapshot, 0 only on board",
+        "Done: column only in snapshot (1 cards)",
+    ]
+
+    store.restore_column(digest, 1, board)
+    assert [card.label for card in board.iter_cards(board.find_column("Done"))] == ["Finished"]
+    assert [card.label for card in board.iter_cards(input_queue)] == ["Second"]
+
+def test_restore_column_does_not_duplicate_moved_cards(tmp_path):
+    """Tests that restoring a column takes back a card that has since moved elsewhere."""
+    store = SnapshotStore(tmp_path)
+    board = BoardModel.from_dict({"columns": [
+        {"title": "A", "cards": [{"label": "x", "description": "", "details": "", "id": "u1"}]},
+        {"title": "B", "cards": []},
+    ]})
+    digest = store.take(board).digest
+
+    column_a, column_b = board.columns
+    board.move_card(next(board.iter_cards(column_a)), column_b)
+    store.restore_column(digest, 0, board)
+
+    assert [card.uid for card in board.iter_cards(column_a)] == ["u1"]
+    assert list(board.iter_cards(column_b)) == []
@@ -3,6 +3,7 @@ import os
 from unittest.mock import patch
 from pathlib import Path
 
+from model import BoardModel
 from storage import load_board, save_board
 
 # Define a mock board structure for testing
@@ -25,7 +26,7 @@ def test_save_and_load_board():
     """Tests that saving and loading a board works correctly."""
     try:
         # 1. Save the mock board
-        save_board(MOCK_BOARD)
+        save_board(BoardModel.from_dict(MOCK_BOARD))
 
         # 2. Check if the file was created and has the correct content
         assert os.path.exists(TEST_BOARD_PATH)
@@ -35,9 +36,29 @@ def test_save_and_load_board():
 
         # 3. Load the board and check if it matches
         loaded = load_board()
-        assert loaded == MOCK_BOARD
+        assert loaded.to_dict() == MOCK_BOARD
 
     finally:
         # 4. Clean up the test file
         if os.path.exists(TEST_BOARD_PATH):
             os.remove(TEST_BOARD_PATH)
+
+@patch('storage.DATA_FILE', Path(TEST_BOARD_PATH))
+def test_corrupted_board_is_kept():
+    """Tests that every corrupted board file is moved aside instead of being overwritten."""
+    board_path = Path(TEST_BOARD_PATH)
+    try:
+        for contents in ("{not json", "{also not json"):
+            with open(TEST_BOARD_PATH, 'w') as f:
+                f.write(contents)
+
+            loaded = load_board()
+            assert [column.title for column in loaded.columns] == ["Input Queue", "In Progress", "Done"]
+
+        kept = sorted(board_path.parent.glob(board_path.name + ".corrupt-*"))
+        assert sorted(path.read_text() for path in kept) == ["{also not json", "{not json"]
+
+    finally:
+        for path in [board_path, *board_path.parent.glob(board_path.name + ".corrupt-*")]:
+            if path.exists():
+                path.unlink()
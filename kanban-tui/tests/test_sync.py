@@ -0,0 +1,209 @@
+import asyncio
+import threading
+
+import pytest
+
+from model import BoardModel, CardModel
+from sync import SyncEngine, compare_versions
+from sync_server import DeltaLog, SyncServer
+
+MOCK_BOARD = {
+    "columns": [
+        {"title": "Input Queue", "cards": [
+            {"label": "Shared Card", "description": "", "details": ""}
+        ]},
+        {"title": "In Progress", "cards": []},
+        {"title": "Done", "cards": []},
+    ]
+}
+
+@pytest.fixture
+def server():
+    """Runs the reference sync server on a free localhost port."""
+    server = SyncServer(("localhost", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def server_url(server):
+    return f"http://localhost:{server.server_address[1]}"
+
+def _labels(board):
+    return {column.title: [card.label for card in board.iter_cards(column)] for column in board.columns}
+
+def test_compare_versions():
+    """Tests ordering of version vectors."""
+    assert compare_versions({"a": 1}, {"a": 1}) == "equal"
+    assert compare_versions({"a": 2}, {"a": 1}) == "after"
+    assert compare_versions({"a": 1}, {"a": 1, "b": 1}) == "before"
+    assert compare_versions({"a": 2}, {"a": 1, "b": 1}) == "concurrent"
+
+def test_two_replicas_converge(server_url, tmp_path):
+    """Tests that adds, moves and deletes on one replica reach the other."""
+    laptop_board = BoardModel.from_dict(MOCK_BOARD)
+    laptop = SyncEngine(server_url, tmp_path / "laptop.json")
+    workstation_board = BoardModel()
+    workstation = SyncEngine(server_url, tmp_path / "workstation.json")
+
+    async def scenario():
+        await laptop.sync(lambda: laptop_board)
+        await workstation.sync(lambda: workstation_board)
+        assert _labels(workstation_board) == _labels(laptop_board)
+
+        card = next(workstation_board.iter_cards(workstation_board.columns[0]))
+        workstation_board.move_card(card, workstation_board.columns[2])
+        workstation_board.add_card(workstation_board.columns[1], CardModel("New Card"))
+        await workstation.sync(lambda: workstation_board)
+        await laptop.sync(lambda: laptop_board)
+        assert _labels(laptop_board) == {
+            "Input Queue": [],
+            "In Progress": ["New Card"],
+            "Done": ["Shared Card"],
+        }
+
+        laptop_board.remove_card(next(laptop_board.iter_cards(laptop_board.columns[1])))
+        await laptop.sync(lambda: laptop_board)
+        await workstation.sync(lambda: workstation_board)
+        assert _labels(workstation_board) == _labels(laptop_board)
+
+    asyncio.run(scenario())
+
+def test_concurrent_edits_resolve_per_card(server_url, tmp_path):
+    """Tests that concurrent edits to one card pick the same winner everywhere without touching other cards."""
+    boards = [BoardModel.from_dict(MOCK_BOARD), BoardModel()]
+    engines = [SyncEngine(server_url, tmp_path / "a.json"), SyncEngine(server_url, tmp_path / "b.json")]
+
+    async def scenario():
+        for engine, board in zip(engines, boards):
+            await engine.sync(lambda: board)
+
+        for engine, board in zip(engines, boards):
+            card = next(board.iter_cards(board.columns[0]))
+            board.update_card(card, f"Edited by {engine.replica}", "", "")
+        boards[0].add_card(boards[0].columns[1], CardModel("Unrelated"))
+
+        for _ in range(2):
+            for engine, board in zip(engines, boards):
+                await engine.sync(lambda: board)
+
+    asyncio.run(scenario())
+    winner = max(engine.replica for engine in engines)
+    for board in boards:
+        assert _labels(board) == {
+            "Input Queue": [f"Edited by {winner}"],
+            "In Progress": ["Unrelated"],
+            "Done": [],
+        }
+
+def test_reconnect_resumes_from_last_version(server_url, tmp_path):
+    """Tests that a restarted engine only pulls deltas it has not seen."""
+    state_file = tmp_path / "laptop.json"
+    board = BoardModel.from_dict(MOCK_BOARD)
+    asyncio.run(SyncEngine(server_url, state_file).sync(lambda: board))
+
+    restarted = SyncEngine(server_url, state_file)
+    assert restarted.last_version > 0
+    assert asyncio.run(restarted.pull()) == []
+
+def test_offline_changes_are_kept_until_acknowledged(tmp_path):
+    """Tests that a failed push leaves the batch queued for the next round."""
+    engine = SyncEngine("http://localhost:1", tmp_path / "offline.json")
+    board = BoardModel.from_dict(MOCK_BOARD)
+    with pytest.raises(OSError):
+        asyncio.run(engine.sync(lambda: board))
+    assert engine.inflight
+    assert SyncEngine("http://localhost:1", tmp_path / "offline.json").inflight == engine.inflight
+
+def test_server_restart_resends_everything(server, server_url, tmp_path):
+    """Tests that a server that lost its log is detected and refilled by every replica."""
+    laptop_board = BoardModel.from_dict(MOCK_BOARD)
+    laptop = SyncEngine(server_url, tmp_path / "laptop.json")
+    workstation_board = BoardModel()
+    workstation = SyncEngine(server_url, tmp_path / "workstation.json")
+
+    async def scenario():
+        await laptop.sync(lambda: laptop_board)
+        await workstation.sync(lambda: workstation_board)
+
+        # Simulate a restart of the in-memory server.
+        server.log = DeltaLog()
+        workstation_board.add_card(workstation_board.columns[1], CardModel("After Restart"))
+        await workstation.sync(lambda: workstation_board)
+        await laptop.sync(lambda: laptop_board)
+        assert _labels(laptop_board)["In Progress"] == ["After Restart"]
+
+        # A replica that joins after the restart still sees the laptop's cards.
+        late_board = BoardModel()
+        late = SyncEngine(server_url, tmp_path / "late.json")
+        await laptop.sync(lambda: laptop_board)
+        await late.sync(lambda: late_board)
+        assert _labels(late_board) == _labels(laptop_board)
+
+    asyncio.run(scenario())
+
+def test_unknown_tombstones_change_nothing(tmp_path):
+    """Tests that a deletion of a card this replica never had is not counted as applied."""
+    engine = SyncEngine("http://localhost:1", tmp_path / "a.json")
+    board = BoardModel.from_dict(MOCK_BOARD)
+    engine.record_local(board)
+    tombstone = {"key": "card:never-seen", "vv": {"other": 2}, "origin": "other", "value": None}
+    assert engine.apply_remote(board, [tombstone]) == 0
+    assert engine.apply_remote(board, [dict(tombstone, vv={"other": 3})]) == 0
+
+def test_board_replaced_during_round(server_url, tmp_path):
+    """Tests that remote cards pulled while the board is replaced land on the new board."""
+    sender_board = BoardModel.from_dict(MOCK_BOARD)
+    sender = SyncEngine(server_url, tmp_path / "sender.json")
+    boards = [BoardModel()]
+    receiver = SyncEngine(server_url, tmp_path / "receiver.json")
+
+    async def scenario():
+        await receiver.sync(lambda: boards[-1])
+        await sender.sync(lambda: sender_board)
+
+        def current_board():
+            # The first call records local changes; the board is then
+            # replaced before the pulled deltas are applied.
+            if len(boards) == 1:
+                boards.append(BoardModel())
+                return boards[0]
+            return boards[-1]
+
+        await receiver.sync(current_board)
+        await receiver.sync(lambda: boards[-1])
+        await sender.sync(lambda: sender_board)
+
+    asyncio.run(scenario())
+    assert _labels(boards[-1])["Input Queue"] == ["Shared Card"]
+    assert _labels(sender_board)["Input Queue"] == ["Shared Card"]
+
+def test_server_restart_single_replica(server, server_url, tmp_path):
+    """Tests that a lone replica refills a restarted server with its whole board."""
+    board = BoardModel.from_dict(MOCK_BOARD)
+    engine = SyncEngine(server_url, tmp_path / "laptop.json")
+
+    async def scenario():
+        for label in ("One", "Two", "Three"):
+            board.add_card(board.columns[1], CardModel(label))
+            await engine.sync(lambda: board)
+
+        server.log = DeltaLog()
+        board.add_card(board.columns[2], CardModel("After Restart"))
+        for _ in range(4):
+            await engine.sync(lambda: board)
+
+        fresh_board = BoardModel()
+        await SyncEngine(server_url, tmp_path / "fresh.json").sync(lambda: fresh_board)
+        # Order within a column is not synced, only which column a card is in.
+        assert {title: sorted(labels) for title, labels in _labels(fresh_board).items()} == {
+            "Input Queue": ["Shared Card"],
+            "In Progress": ["One", "Three", "Two"],
+            "Done": ["After Restart"],
+        }
+
+    asyncio.run(scenario())